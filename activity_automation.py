@@ -5,16 +5,29 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import importlib
+import functools
+import hashlib
+import http.client
+import json
+import os
 import random
 import re
 import shlex
 import subprocess
 import sys
-from dataclasses import dataclass
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
-import textwrap
+from typing import Any, Iterable
+
+
+# Echo every command/API call (``$ ...`` banners); dry runs always echo.
+VERBOSE = os.getenv("AUTO_VERBOSE") == "1"
+
+_GITHUB_REMOTE_RE = re.compile(r"github\.com[:/]([^/]+/[^/]+?)(?:\.git)?/?$")
 
 
 class AutomationError(RuntimeError):
@@ -24,190 +37,211 @@ class AutomationError(RuntimeError):
 @dataclass(frozen=True)
 class CodeSnippet:
     branch: str
-    path: Path
-    content: str
+    paths: tuple[Path, ...]
+    contents: tuple[str, ...]
     commit_message: str
     pr_title: str
     pr_body: str
     executable: bool = False
+    encoded: tuple[bytes, ...] = field(init=False, repr=False, compare=False)
+    blob_ids: tuple[str, ...] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        if len(self.paths) != len(self.contents):
+            raise AutomationError(f"Snippet {self.branch} needs one content entry per path.")
+        object.__setattr__(self, "encoded", tuple(content.encode("utf-8") for content in self.contents))
+        # Git's own object ids, so the remote copy can be compared without reading blobs back.
+        object.__setattr__(
+            self,
+            "blob_ids",
+            tuple(hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest() for data in self.encoded),
+        )
 
-SNIPPETS: tuple[CodeSnippet, ...] = (
-    CodeSnippet(
-        branch="feature/python-snippet",
-        path=Path("snippets/random_tool.py"),
-        content=textwrap.dedent(
-            """
-            \"\"\"Small utility with deterministic pseudo-random output.\"\"\"
 
-            from __future__ import annotations
+PYTHON_SOURCE = """\"\"\"Small utility with deterministic pseudo-random output.\"\"\"
+
+from __future__ import annotations
+
+import hashlib
+
+
+def fingerprint(text: str, length: int = 8) -> str:
+    # blake2b sized to the requested length; its digest_size is capped at 64 bytes.
+    size = min(max((length + 1) // 2, 1), 64)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=size).hexdigest()[:length]
+
 
-            import hashlib
+if __name__ == "__main__":
+    print(fingerprint("codex-demo"))
+"""
+
+
+JS_SOURCE = """// Minimal widget helper to format metric displays.
+export function formatMetric(value, unit = '') {
+  const rounded = Number.parseFloat(value).toFixed(2);
+  return unit ? `${rounded} ${unit}`.trim() : rounded;
+}
+
+export function buildWidgetConfig(title, value, unit) {
+  return {
+    title,
+    value: formatMetric(value, unit),
+    generatedAt: new Date().toISOString(),
+  };
+}
+
+// Emit a demo config when run directly with Node.
+if (import.meta.url === `file://${process.argv[1]}`) {
+  console.log(buildWidgetConfig('demo', 42, 'pts'));
+}
+"""
+
+
+GO_SOURCE = """package main
+
+import (
+    "crypto/sha1"
+    "encoding/hex"
+    "fmt"
+    "os"
+)
+
+func checksum(parts ...string) string {
+    h := sha1.New()
+    for _, part := range parts {
+        h.Write([]byte(part))
+    }
+    return hex.EncodeToString(h.Sum(nil))[:12]
+}
+
+func main() {
+    args := os.Args[1:]
+    if len(args) == 0 {
+        fmt.Println(checksum("codex", "demo"))
+        return
+    }
+    fmt.Println(checksum(args...))
+}
+"""
+
+
+RUST_SOURCE = """fn banner(message: &str) -> String {
+    format!("*** {} ***", message.to_uppercase())
+}
 
+fn main() {
+    println!("{}", banner("codex demo"));
+}
+
+#[cfg(test)]
+mod tests {
+    use super::banner;
+
+    #[test]
+    fn banner_wraps_text() {
+        assert_eq!(banner("demo"), "*** DEMO ***");
+    }
+}
+"""
 
-            def fingerprint(text: str, length: int = 8) -> str:
-                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
-                return digest[:length]
 
+JAVA_SOURCE = """package java_demo;
 
-            if __name__ == "__main__":
-                print(fingerprint("codex-demo"))
-            """
-        ).strip()
-        + "\n",
+import java.time.LocalDateTime;
+import java.time.format.DateTimeFormatter;
+
+public final class Main {
+    private Main() {}
+
+    public static String greeting(String name) {
+        return "Hello, " + name + "!";
+    }
+
+    public static void main(String[] args) {
+        var formatter = DateTimeFormatter.ISO_LOCAL_DATE_TIME;
+        var timestamp = LocalDateTime.now().format(formatter);
+        System.out.println(greeting("Codex") + " @ " + timestamp);
+    }
+}
+"""
+
+
+RUBY_SOURCE = """#!/usr/bin/env ruby
+# frozen_string_literal: true
+
+def summarize(text)
+  counts = Hash.new(0)
+  text.split.each { |word| counts[word.downcase] += 1 }
+  counts.sort_by { |word, count| [-count, word] }
+end
+
+if $PROGRAM_NAME == __FILE__
+  sample = "Codex codex demo script"
+  summarize(sample).each do |word, count|
+    puts format("%s => %d", word, count)
+  end
+end
+"""
+
+
+BASH_SOURCE = r"""#!/usr/bin/env bash
+set -euo pipefail
+
+project=${1:-sample}
+seed=${2:-$RANDOM}
+
+hash=$(printf '%s:%s' "$project" "$seed" | shasum | cut -c1-12)
+metric=$((seed % 100 + 1))
+
+printf 'project=%s\nseed=%s\nhash=%s\nmetric=%s\n' "$project" "$seed" "$hash" "$metric"
+"""
+
+
+SNIPPETS: tuple[CodeSnippet, ...] = (
+    CodeSnippet(
+        branch="feature/python-snippet",
+        paths=(Path("snippets/random_tool.py"),),
+        contents=(PYTHON_SOURCE,),
         commit_message="Add Python fingerprint helper",
         pr_title="Add Python fingerprint helper",
         pr_body="新增 Python 指纹工具演示。",
     ),
     CodeSnippet(
         branch="feature/js-widget",
-        path=Path("web/widget.js"),
-        content=textwrap.dedent(
-            """
-            // Minimal widget helper to format metric displays.
-            export function formatMetric(value, unit = '') {
-              const rounded = Number.parseFloat(value).toFixed(2);
-              return unit ? `${rounded} ${unit}`.trim() : rounded;
-            }
-
-            export function buildWidgetConfig(title, value, unit) {
-              return {
-                title,
-                value: formatMetric(value, unit),
-                generatedAt: new Date().toISOString(),
-              };
-            }
-
-            // Emit a demo config when run directly with Node.
-            if (import.meta.url === `file://${process.argv[1]}`) {
-              console.log(buildWidgetConfig('demo', 42, 'pts'));
-            }
-            """
-        ).strip()
-        + "\n",
+        paths=(Path("web/widget.js"),),
+        contents=(JS_SOURCE,),
         commit_message="Add simple JS widget formatter",
         pr_title="Add JS widget formatter",
         pr_body="新增 JS widget 工具演示。",
     ),
     CodeSnippet(
         branch="feature/go-tool",
-        path=Path("cmd/randomtool/main.go"),
-        content=textwrap.dedent(
-            """
-            package main
-
-            import (
-                "crypto/sha1"
-                "encoding/hex"
-                "fmt"
-                "os"
-            )
-
-            func checksum(parts ...string) string {
-                h := sha1.New()
-                for _, part := range parts {
-                    h.Write([]byte(part))
-                }
-                return hex.EncodeToString(h.Sum(nil))[:12]
-            }
-
-            func main() {
-                args := os.Args[1:]
-                if len(args) == 0 {
-                    fmt.Println(checksum("codex", "demo"))
-                    return
-                }
-                fmt.Println(checksum(args...))
-            }
-            """
-        ).strip()
-        + "\n",
+        paths=(Path("cmd/randomtool/main.go"),),
+        contents=(GO_SOURCE,),
         commit_message="Add Go checksum demo",
         pr_title="Add Go checksum demo",
         pr_body="新增 Go 校验和示例程序。",
     ),
     CodeSnippet(
         branch="feature/rust-demo",
-        path=Path("rust_demo/src/main.rs"),
-        content=textwrap.dedent(
-            """
-            fn banner(message: &str) -> String {
-                format!("*** {} ***", message.to_uppercase())
-            }
-
-            fn main() {
-                println!("{}", banner("codex demo"));
-            }
-
-            #[cfg(test)]
-            mod tests {
-                use super::banner;
-
-                #[test]
-                fn banner_wraps_text() {
-                    assert_eq!(banner("demo"), "*** DEMO ***");
-                }
-            }
-            """
-        ).strip()
-        + "\n",
+        paths=(Path("rust_demo/src/main.rs"),),
+        contents=(RUST_SOURCE,),
         commit_message="Add Rust banner demo",
         pr_title="Add Rust banner demo",
         pr_body="新增 Rust banner 示例和简单测试。",
     ),
     CodeSnippet(
         branch="feature/java-sample",
-        path=Path("java_demo/src/Main.java"),
-        content=textwrap.dedent(
-            """
-            package java_demo;
-
-            import java.time.LocalDateTime;
-            import java.time.format.DateTimeFormatter;
-
-            public final class Main {
-                private Main() {}
-
-                public static String greeting(String name) {
-                    return "Hello, " + name + "!";
-                }
-
-                public static void main(String[] args) {
-                    var formatter = DateTimeFormatter.ISO_LOCAL_DATE_TIME;
-                    var timestamp = LocalDateTime.now().format(formatter);
-                    System.out.println(greeting("Codex") + " @ " + timestamp);
-                }
-            }
-            """
-        ).strip()
-        + "\n",
+        paths=(Path("java_demo/src/Main.java"),),
+        contents=(JAVA_SOURCE,),
         commit_message="Add Java greeting sample",
         pr_title="Add Java greeting sample",
         pr_body="新增 Java 问候程序。",
     ),
     CodeSnippet(
         branch="feature/ruby-script",
-        path=Path("ruby_scripts/summary.rb"),
-        content=textwrap.dedent(
-            """
-            #!/usr/bin/env ruby
-            # frozen_string_literal: true
-
-            def summarize(text)
-              counts = Hash.new(0)
-              text.split.each { |word| counts[word.downcase] += 1 }
-              counts.sort_by { |word, count| [-count, word] }
-            end
-
-            if $PROGRAM_NAME == __FILE__
-              sample = "Codex codex demo script"
-              summarize(sample).each do |word, count|
-                puts format("%s => %d", word, count)
-              end
-            end
-            """
-        ).strip()
-        + "\n",
+        paths=(Path("ruby_scripts/summary.rb"),),
+        contents=(RUBY_SOURCE,),
         commit_message="Add Ruby word summary script",
         pr_title="Add Ruby word summary",
         pr_body="新增 Ruby 脚本统计词频。",
@@ -215,22 +249,8 @@ SNIPPETS: tuple[CodeSnippet, ...] = (
     ),
     CodeSnippet(
         branch="feature/bash-tool",
-        path=Path("scripts/random_report.sh"),
-        content=textwrap.dedent(
-            """
-            #!/usr/bin/env bash
-            set -euo pipefail
-
-            project=${1:-sample}
-            seed=${2:-$RANDOM}
-
-            hash=$(printf '%s:%s' "$project" "$seed" | shasum | cut -c1-12)
-            metric=$((seed % 100 + 1))
-
-            printf 'project=%s\nseed=%s\nhash=%s\nmetric=%s\n' "$project" "$seed" "$hash" "$metric"
-            """
-        ).strip()
-        + "\n",
+        paths=(Path("scripts/random_report.sh"),),
+        contents=(BASH_SOURCE,),
         commit_message="Add bash random report script",
         pr_title="Add bash random report script",
         pr_body="新增 Bash 随机报告脚本。",
@@ -239,6 +259,13 @@ SNIPPETS: tuple[CodeSnippet, ...] = (
 )
 
 
+BATCH_BRANCH = "feature/snippet-batch"
+PUBLISH_WORKERS = 8
+MERGE_ATTEMPTS = 3
+# Methods GitHubClient may re-send after a reply was lost; POST and the merge PUT are not safe.
+RETRY_SAFE_METHODS = frozenset({"GET", "DELETE"})
+
+
 ISSUES: tuple[tuple[str, str], ...] = (
     ("Document Python fingerprint helper", "补充 Python 指纹工具的使用说明。"),
     ("Add JS widget docs", "撰写 JS widget formatter 的 README 示例。"),
@@ -271,6 +298,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--snippet-count", type=int, default=len(SNIPPETS), help="Number of snippet PRs to create."
     )
+    parser.add_argument(
+        "--batch-snippets",
+        action="store_true",
+        help="Ship all selected snippets in a single branch/commit/PR.",
+    )
     parser.add_argument(
         "--issue-count", type=int, default=len(ISSUES), help="Number of issues to create."
     )
@@ -279,9 +311,16 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def ensure_cli_available(binary: str) -> None:
-    if shutil.which(binary) is None:  # type: ignore[name-defined]
+@functools.lru_cache(maxsize=None)
+def _which(binary: str) -> str | None:
+    return shutil.which(binary)  # type: ignore[name-defined]
+
+
+def ensure_cli_available(binary: str) -> str:
+    path = _which(binary)
+    if path is None:
         raise AutomationError(f"Required executable '{binary}' not found in PATH.")
+    return path
 
 
 try:
@@ -291,28 +330,220 @@ except ImportError:  # pragma: no cover
 
 
 def run(cmd: Iterable[str], *, capture: bool = False, input_text: str | None = None, dry_run: bool = False) -> str:
-    text = " ".join(shlex.quote(part) for part in cmd)
-    print(f"$ {text}")
+    argv = list(cmd)
+    if VERBOSE or dry_run:
+        print(f"$ {shlex.join(argv)}")
     if dry_run:
         return ""
+    # Exec the cached absolute path so the child skips its own $PATH search.
+    argv[0] = _which(argv[0]) or argv[0]
     result = subprocess.run(
-        list(cmd),
+        argv,
         check=True,
-        text=True,
         capture_output=capture,
-        input=input_text,
+        input=input_text.encode("utf-8") if input_text is not None else None,
+        # Lets CPython use posix_spawn; GitHubClient's sockets are non-inheritable anyway.
+        close_fds=False,
     )
     if capture:
-        return result.stdout.strip()
+        return result.stdout.decode("utf-8").strip()
     return ""
 
 
-def ensure_clean(allow_dirty: bool, dry_run: bool) -> None:
-    status = run(["git", "status", "--porcelain"], capture=True, dry_run=dry_run)
+def run_line(cmd: Iterable[str]) -> str:
+    """Return the first stdout line of ``cmd`` without waiting for it to finish."""
+    argv = list(cmd)
+    if VERBOSE:
+        print(f"$ {shlex.join(argv)}")
+    argv[0] = _which(argv[0]) or argv[0]
+    with subprocess.Popen(argv, stdout=subprocess.PIPE, close_fds=False) as proc:
+        assert proc.stdout is not None
+        line = proc.stdout.readline()
+        if not line:
+            returncode = proc.wait()
+            if returncode:
+                raise subprocess.CalledProcessError(returncode, argv)
+        elif proc.poll() is None:
+            # Everything we need has arrived; don't wait on trailing output.
+            proc.terminate()
+    return line.decode("utf-8").strip()
+
+
+def chain_commands(steps: Iterable[Iterable[str]]) -> str:
+    """Join argv lists into a single ``&&`` chain for one shell invocation."""
+    return " && ".join(" ".join(shlex.quote(part) for part in step) for step in steps)
+
+
+def run_chain(cmd_str: str, *, input_text: str | None = None, dry_run: bool = False) -> None:
+    if VERBOSE or dry_run:
+        print(f"$ {cmd_str}")
+    if dry_run:
+        return
+    subprocess.run(
+        [_which("bash") or "bash", "-c", cmd_str],
+        check=True,
+        input=input_text.encode("utf-8") if input_text is not None else None,
+        close_fds=False,
+    )
+
+
+class GitHubAPIError(AutomationError):
+    """Raised when the GitHub REST API answers with an error status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class GitHubClient:
+    """Tiny GitHub REST client that reuses one keep-alive HTTPS connection.
+
+    The auth token and ``owner/repo`` slug are resolved once on first use, so
+    N PRs/issues cost one ``gh auth token`` call and one TLS handshake instead
+    of N ``gh`` process launches. Each thread keeps its own connection, so the
+    client can be shared by a thread pool.
+    """
+
+    host = "api.github.com"
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._token: str | None = None
+        self._repo: str | None = None
+
+    @property
+    def token(self) -> str:
+        with self._lock:
+            if self._token is None:
+                self._token = (
+                    os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or run_line(["gh", "auth", "token"])
+                )
+                if not self._token:
+                    raise AutomationError("No GitHub token available; run 'gh auth login' first.")
+            return self._token
+
+    @property
+    def repo(self) -> str:
+        with self._lock:
+            if self._repo is None:
+                remote = run_line(["git", "remote", "get-url", "origin"])
+                match = _GITHUB_REMOTE_RE.search(remote)
+                if not match:
+                    raise AutomationError(f"Remote 'origin' is not a GitHub repository: {remote}")
+                self._repo = match.group(1)
+            return self._repo
+
+    def request(self, method: str, path: str, payload: dict | None = None) -> Any:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self.token}",
+            "User-Agent": "activity-automation",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        if VERBOSE:
+            print(f"> {method} {path}")
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPSConnection(self.host, timeout=60)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                self._local.conn = None
+                # GitHub may close an idle keep-alive connection; reconnect once. A request
+                # that may have reached the server is only replayed if repeating it is harmless,
+                # so a lost reply never turns into a duplicate issue or PR.
+                stale = isinstance(exc, (http.client.HTTPException, ConnectionError))
+                if attempt or not stale or (sent and method not in RETRY_SAFE_METHODS):
+                    raise AutomationError(f"GitHub API {method} {path} failed: {exc}") from exc
+        if response.status >= 400:
+            # Error bodies are not always JSON (e.g. HTML 502/503 pages from the edge).
+            try:
+                message = json.loads(data).get("message", "")
+            except (ValueError, AttributeError):
+                message = data[:200].decode("utf-8", "replace").strip()
+            raise GitHubAPIError(response.status, f"GitHub API {method} {path} failed ({response.status}): {message}")
+        return json.loads(data) if data else {}
+
+    def create_pull(self, *, title: str, body: str, head: str, base: str = "main") -> dict:
+        payload = {"title": title, "body": body, "head": head, "base": base}
+        return self.request("POST", f"/repos/{self.repo}/pulls", payload)
+
+    def merge_pull(self, number: str, *, method: str) -> dict:
+        path = f"/repos/{self.repo}/pulls/{number}/merge"
+        for attempt in range(MERGE_ATTEMPTS):
+            try:
+                return self.request("PUT", path, {"merge_method": method})
+            except GitHubAPIError as error:
+                # Concurrent merges move main under us (405/409); give GitHub a moment and retry.
+                if error.status not in (405, 409) or attempt == MERGE_ATTEMPTS - 1:
+                    raise
+                time.sleep(1 + attempt)
+        raise AssertionError("unreachable")
+
+    def delete_branch(self, branch: str) -> None:
+        try:
+            self.request("DELETE", f"/repos/{self.repo}/git/refs/heads/{branch}")
+        except GitHubAPIError as error:
+            # Repos that auto-delete head branches have already dropped the ref on merge.
+            if error.status not in (404, 422):
+                raise
+
+    def create_issue(self, *, title: str, body: str) -> dict:
+        return self.request("POST", f"/repos/{self.repo}/issues", {"title": title, "body": body})
+
+    def find_pull(self, head: str) -> dict | None:
+        owner = self.repo.split("/", 1)[0]
+        query = urllib.parse.urlencode({"head": f"{owner}:{head}", "state": "all", "per_page": 1})
+        pulls = self.request("GET", f"/repos/{self.repo}/pulls?{query}")
+        return pulls[0] if pulls else None
+
+
+GITHUB = GitHubClient()
+
+
+@dataclass(frozen=True)
+class RepoState:
+    """Startup facts gathered by ``startup_probe`` in a single shell invocation.
+
+    ``dirty`` is only probed when the clean check will read it.
+    """
+
+    root: Path
+    dirty: bool
+
+
+def startup_probe(*, check_status: bool) -> RepoState:
+    steps = [["git", "rev-parse", "--is-inside-work-tree", "--show-toplevel"]]
+    if check_status:
+        steps.append(["git", "status", "--porcelain"])
+    cmd_str = chain_commands(steps)
+    if VERBOSE:
+        print(f"$ {cmd_str}")
+    result = subprocess.run(
+        [_which("bash") or "bash", "-c", cmd_str], capture_output=True, check=False, close_fds=False
+    )
+    lines = result.stdout.decode("utf-8").splitlines()
+    if result.returncode != 0 or len(lines) < 2 or lines[0] != "true":
+        raise AutomationError("Run this script from the repository root.")
+    return RepoState(root=Path(lines[1]), dirty=any(line.strip() for line in lines[2:]))
+
+
+def ensure_clean(state: RepoState, allow_dirty: bool, dry_run: bool) -> None:
     if dry_run:
         print("[dry-run] skipping clean check")
         return
-    if status.strip() and not allow_dirty:
+    if state.dirty and not allow_dirty:
         raise AutomationError("Working tree not clean. Commit/stash changes or pass --allow-dirty.")
 
 
@@ -341,136 +572,185 @@ def backfill_year(year: int, sample_size: int, dry_run: bool) -> tuple[str, str,
         print(f"[dry-run] would backfill {sample_size} days for {year} on {branch}")
         return branch, "", ""
 
-    module = importlib.import_module("backfill_commits")
-    module = importlib.reload(module)
-
-    original_plan = module.plan_commits_per_day
-
-    def sampled_plan(dates: list[dt.date], min_commits: int, max_commits: int) -> dict[dt.date, int]:
-        if len(dates) < sample_size:
-            raise AutomationError(f"Year {year} range has only {len(dates)} days; need {sample_size}.")
-        rng = random.Random(seed)
-        chosen = set(rng.sample(dates, sample_size))
-        return {day: (1 if day in chosen else 0) for day in dates}
-
-    module.plan_commits_per_day = sampled_plan
-
-    argv_backup = list(sys.argv)
-    sys.argv = [
-        "backfill_commits.py",
-        "--branch",
-        branch,
-        "--start",
-        start,
-        "--end",
-        end,
-        "--per-day-min",
-        "1",
-        "--per-day-max",
-        "1",
-    ]
+    def sampled_plan(
+        dates: list[dt.date], min_commits: int, max_commits: int, rng: random.Random
+    ) -> list[tuple[dt.date, int]]:
+        size = min(sample_size, len(dates))
+        if size < sample_size:
+            print(f"[info] Year {year} range has only {len(dates)} days; sampling all of them instead of {sample_size}.")
+        # Days are picked from the per-year seed, not ``rng``, so a year always samples the same days.
+        chosen = set(random.Random(seed).sample(dates, size))
+        return [(day, 1 if day in chosen else 0) for day in dates]
+
+    # Imported here so --dry-run never pays for loading the backfill module.
+    from backfill_commits import BackfillError, run_backfill
 
     try:
-        module.main()
-    finally:
-        module.plan_commits_per_day = original_plan
-        sys.argv = argv_backup
+        run_backfill(branch, start, end, per_day_min=1, per_day_max=1, planner=sampled_plan)
+    except BackfillError as error:
+        raise AutomationError(f"Backfill for {year} failed: {error}") from error
 
     push_output = run(["git", "push", "-u", "origin", branch])
-    pr_url = create_pr(
+    pr_url = open_and_merge_pr(
         title=f"Backfill {year} activity",
         body=f"为 {year} 年随机 {sample_size} 天补充 keep.log 记录。",
         head=branch,
+        method="merge",
         dry_run=dry_run,
     )
-    pr_number = extract_pr_number(pr_url)
-    finalize_pr(pr_number, method="merge", dry_run=dry_run)
     return branch, pr_url, push_output or ""
 
 
-def create_pr(*, title: str, body: str, head: str, dry_run: bool) -> str:
+def open_and_merge_pr(*, title: str, body: str, head: str, method: str, dry_run: bool) -> str:
+    """Open a PR and merge it right away; the number comes straight from the API reply."""
     if dry_run:
-        print(f"[dry-run] would open PR '{title}' from {head}")
+        print(f"[dry-run] would open PR '{title}' from {head} and merge it")
         return ""
-    output = run(
-        [
-            "gh",
-            "pr",
-            "create",
-            "--title",
-            title,
-            "--body",
-            body,
-            "--base",
-            "main",
-            "--head",
-            head,
-        ],
-        capture=True,
-    )
-    return output
+    pull = GITHUB.create_pull(title=title, body=body, head=head)
+    finalize_pr(str(pull["number"]), head=head, method=method, dry_run=dry_run)
+    return pull["html_url"]
 
 
-def extract_pr_number(pr_url: str) -> str:
-    match = re.search(r"/pull/(\d+)", pr_url)
-    if not match:
-        raise AutomationError(f"Unable to parse PR number from: {pr_url}")
-    return match.group(1)
-
-
-def finalize_pr(pr_number: str, *, method: str, dry_run: bool) -> None:
+def finalize_pr(pr_number: str, *, head: str, method: str, dry_run: bool) -> None:
+    """Merge server-side; local main is re-synced once at the end of ``main``."""
     if dry_run:
         print(f"[dry-run] would merge PR #{pr_number}")
         return
-    run(["git", "checkout", "main"])
-    run(["git", "pull", "--ff-only", "origin", "main"])
-    flags = {
-        "merge": "--merge",
-        "squash": "--squash",
-    }
-    flag = flags.get(method, "--merge")
-    run(
-        ["gh", "pr", "merge", pr_number, flag, "--delete-branch"],
-        input_text="y\n",
-    )
-    run(["git", "pull", "--ff-only", "origin", "main"])
+    if method not in ("merge", "squash"):
+        method = "merge"
+    GITHUB.merge_pull(pr_number, method=method)
+    GITHUB.delete_branch(head)
+
+
+def sync_local_main(merged_branches: Iterable[str]) -> None:
+    """Move local main to origin/main and drop the local copies of merged branches."""
+    steps = [
+        ["git", "checkout", "main"],
+        ["git", "fetch", "origin", "main"],
+        # --keep behaves like --hard but refuses to clobber local edits (e.g. --allow-dirty).
+        ["git", "reset", "--keep", "origin/main"],
+    ]
+    merged_branches = list(merged_branches)
+    if merged_branches:
+        steps.append(["git", "branch", "-D", *merged_branches])
+    run_chain(chain_commands(steps))
+
+
+def split_published(snippets: Iterable[CodeSnippet]) -> tuple[list[CodeSnippet], list[str]]:
+    """Separate snippets still to ship from those already identical on origin/main.
+
+    One ``git ls-tree`` covers every path; returns ``(pending, existing_pr_urls)``.
+    """
+    snippets = list(snippets)
+    paths = [str(path) for snippet in snippets for path in snippet.paths]
+    listing = run(["git", "ls-tree", "-r", "-z", "origin/main", "--", *paths], capture=True)
+    remote_ids = {}
+    for entry in filter(None, listing.split("\0")):
+        meta, _, path = entry.partition("\t")
+        remote_ids[path] = meta.split()[2]
+    pending: list[CodeSnippet] = []
+    existing: list[str] = []
+    for snippet in snippets:
+        if all(remote_ids.get(str(path)) == blob for path, blob in zip(snippet.paths, snippet.blob_ids)):
+            pull = GITHUB.find_pull(snippet.branch)
+            print(f"[info] {snippet.branch} already on origin/main; skipping.")
+            existing.append(pull["html_url"] if pull else "")
+        else:
+            pending.append(snippet)
+    return pending, existing
+
+
+def write_snippet_files(snippet: CodeSnippet) -> None:
+    mode = 0o755 if snippet.executable else 0o644
+    for path, data in zip(snippet.paths, snippet.encoded):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One open either way; the mode only applies on creation, so existing
+        # executables get a single fchmod on the descriptor.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            if snippet.executable:
+                os.fchmod(fd, mode)
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+
+def commit_chain(branch: str, paths: Iterable[Path], *, push: bool = True) -> str:
+    """Build the branch/add/commit(/push) chain; the message is read from stdin."""
+    steps = [
+        ["git", "checkout", "--no-track", "-b", branch, "origin/main"],
+        ["git", "add", "--", *(str(path) for path in paths)],
+        ["git", "commit", "-F", "-"],
+    ]
+    if push:
+        steps.append(["git", "push", "-u", "origin", branch])
+    return chain_commands(steps)
 
 
-def apply_snippet(snippet: CodeSnippet, dry_run: bool) -> str:
+def prepare_snippet(snippet: CodeSnippet, dry_run: bool) -> CodeSnippet:
+    """Local phase: branch and commit. Shares the working tree, so run serially."""
+    cmd_str = commit_chain(snippet.branch, snippet.paths, push=False)
+    if dry_run:
+        print(f"[dry-run] would create PR for {snippet.branch}")
+        run_chain(cmd_str, dry_run=True)
+        return snippet
+
+    write_snippet_files(snippet)
+    run_chain(cmd_str, input_text=snippet.commit_message)
+    return snippet
+
+
+def publish_snippet(snippet: CodeSnippet, dry_run: bool) -> str:
+    """Remote phase: push, open and merge the PR without touching the working tree."""
     branch = snippet.branch
     if dry_run:
-        print(f"[dry-run] would create PR for {branch}")
+        print(f"[dry-run] would push {branch}, then open and merge its PR")
         return ""
 
-    run(["git", "checkout", "main"])
-    run(["git", "checkout", "-b", branch])
-    snippet.path.parent.mkdir(parents=True, exist_ok=True)
-    snippet.path.write_text(snippet.content, encoding="utf-8")
-    if snippet.executable:
-        snippet.path.chmod(0o755)
-    run(["git", "add", str(snippet.path)])
-    run(["git", "commit", "-m", snippet.commit_message])
-    run(["git", "push", "-u", "origin", branch])
-    pr_url = create_pr(title=snippet.pr_title, body=snippet.pr_body, head=branch, dry_run=dry_run)
-    pr_number = extract_pr_number(pr_url)
-    finalize_pr(pr_number, method="squash", dry_run=dry_run)
-    return pr_url
+    # No -u: concurrent pushes would race on writing .git/config.
+    run(["git", "push", "origin", branch])
+    return open_and_merge_pr(
+        title=snippet.pr_title, body=snippet.pr_body, head=branch, method="squash", dry_run=dry_run
+    )
+
+
+def apply_snippets(snippets: Iterable[CodeSnippet], dry_run: bool) -> list[str]:
+    prepared = [prepare_snippet(snippet, dry_run) for snippet in snippets]
+    if not prepared:
+        return []
+    if dry_run:
+        # Previews run in order so their lines do not interleave.
+        return [publish_snippet(snippet, dry_run) for snippet in prepared]
+    with ThreadPoolExecutor(max_workers=PUBLISH_WORKERS) as pool:
+        return list(pool.map(functools.partial(publish_snippet, dry_run=dry_run), prepared))
+
+
+def batch_apply_snippets(snippets: Iterable[CodeSnippet], dry_run: bool) -> str:
+    """Ship every snippet in one branch, one commit, one push and one PR."""
+    snippets = list(snippets)
+    if not snippets:
+        return ""
+    branch = BATCH_BRANCH
+    paths = [path for snippet in snippets for path in snippet.paths]
+    title = f"Add {len(snippets)} code snippets"
+    body = "\n".join(f"- {snippet.pr_title}: {snippet.pr_body}" for snippet in snippets)
+    cmd_str = commit_chain(branch, paths)
+    if dry_run:
+        print(f"[dry-run] would create batched PR for {branch}")
+        run_chain(cmd_str, dry_run=True)
+        return ""
+
+    for snippet in snippets:
+        write_snippet_files(snippet)
+    run_chain(cmd_str, input_text=title)
+    return open_and_merge_pr(title=title, body=body, head=branch, method="squash", dry_run=dry_run)
 
 
 def create_issue(title: str, body: str, dry_run: bool) -> str:
     if dry_run:
         print(f"[dry-run] would open issue '{title}'")
         return ""
-    output = run([
-        "gh",
-        "issue",
-        "create",
-        "--title",
-        title,
-        "--body",
-        body,
-    ], capture=True)
-    return output
+    return GITHUB.create_issue(title=title, body=body)["html_url"]
 
 
 def main() -> None:
@@ -478,26 +758,43 @@ def main() -> None:
     ensure_cli_available("git")
     ensure_cli_available("gh")
 
-    repo_root = Path.cwd()
-    if not (repo_root / ".git").exists():
+    state = startup_probe(check_status=not args.dry_run and not args.allow_dirty)
+    if state.root != Path.cwd().resolve():
         raise AutomationError("Run this script from the repository root.")
 
-    ensure_clean(args.allow_dirty, args.dry_run)
+    ensure_clean(state, args.allow_dirty, args.dry_run)
+    if not args.dry_run:
+        # Resolve the token once; children inherit GH_TOKEN, so gh's git credential
+        # helper answers every fetch/push without re-reading hosts.yml or the keyring.
+        os.environ["GH_TOKEN"] = GITHUB.token
+    # Merges happen server-side, so local main is only fetched here and synced at the end.
+    run(["git", "fetch", "origin", "main"], dry_run=args.dry_run)
 
     years = [int(part.strip()) for part in args.years.split(",") if part.strip()]
     summary: dict[str, list[str]] = {"prs": [], "issues": []}
+    merged_branches: list[str] = []
 
     if args.backfill_count > 0:
         if args.backfill_count > len(years):
             raise AutomationError("--backfill-count exceeds number of parsed years.")
         for year in years[: args.backfill_count]:
-            pr = backfill_year(year, args.sample_size, args.dry_run)
-            summary["prs"].append(pr[1])
+            # Each year branches off the previous (unsynced) one, so the merges stay clean.
+            branch, pr_url, _ = backfill_year(year, args.sample_size, args.dry_run)
+            merged_branches.append(branch)
+            summary["prs"].append(pr_url)
 
     if args.snippet_count > 0:
-        for snippet in SNIPPETS[: args.snippet_count]:
-            pr_url = apply_snippet(snippet, args.dry_run)
-            summary["prs"].append(pr_url)
+        snippets = list(SNIPPETS[: args.snippet_count])
+        if not args.dry_run:
+            snippets, existing = split_published(snippets)
+            summary["prs"].extend(existing)
+        if args.batch_snippets:
+            if snippets:
+                summary["prs"].append(batch_apply_snippets(snippets, args.dry_run))
+                merged_branches.append(BATCH_BRANCH)
+        else:
+            summary["prs"].extend(apply_snippets(snippets, args.dry_run))
+            merged_branches.extend(snippet.branch for snippet in snippets)
 
     if args.issue_count > 0:
         if args.issue_count > len(ISSUES):
@@ -506,6 +803,9 @@ def main() -> None:
             issue_url = create_issue(title, body, args.dry_run)
             summary["issues"].append(issue_url)
 
+    if merged_branches and not args.dry_run:
+        sync_local_main(merged_branches)
+
     print("Automation complete.")
     for pr in filter(None, summary["prs"]):
         print(f"  PR: {pr}")
@@ -521,4 +821,7 @@ if __name__ == "__main__":
         sys.exit(1)
     except subprocess.CalledProcessError as error:
         print(f"Command failed: {error}", file=sys.stderr)
+        if error.stderr:
+            stderr = error.stderr.decode() if isinstance(error.stderr, bytes) else error.stderr
+            print(stderr.rstrip(), file=sys.stderr)
         sys.exit(error.returncode)
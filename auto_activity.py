@@ -9,6 +9,7 @@ import os
 import shlex
 import subprocess
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 
 
@@ -99,20 +100,36 @@ def run(cmd: list[str], *, dry_run: bool, capture: bool = False) -> str:
     if dry_run:
         print("[dry-run] command skipped")
         return ""
+    # Nothing this script opens is inheritable, so there is no fd sweep to pay for.
     if capture:
-        return subprocess.check_output(cmd, text=True).strip()
-    subprocess.check_call(cmd)
+        return subprocess.check_output(cmd, text=True, close_fds=False).strip()
+    subprocess.check_call(cmd, close_fds=False)
     return ""
 
 
-def ensure_repo(path: Path) -> None:
-    if not (path / ".git").exists():
+@dataclass(frozen=True)
+class RepoState:
+    root: Path
+    dirty: bool  # only probed when a PR is going to be created
+
+
+def startup_probe(*, check_status: bool) -> RepoState:
+    cmd = "git rev-parse --is-inside-work-tree --show-toplevel"
+    if check_status:
+        cmd += " && git status --porcelain"
+    print(f"$ {cmd}")
+    result = subprocess.run(["bash", "-c", cmd], capture_output=True, text=True, check=False, close_fds=False)
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) < 2 or lines[0] != "true":
         raise AutoActivityError("Current directory is not a git repository.")
+    return RepoState(root=Path(lines[1]), dirty=any(line.strip() for line in lines[2:]))
 
 
-def ensure_clean_worktree(*, dry_run: bool) -> None:
-    status = run(["git", "status", "--porcelain"], dry_run=dry_run, capture=True)
-    if status.strip():
+def ensure_clean_worktree(state: RepoState, *, dry_run: bool) -> None:
+    if dry_run:
+        print("[dry-run] skipping clean check")
+        return
+    if state.dirty:
         raise AutoActivityError("Working tree is not clean; please commit or stash changes first.")
 
 
@@ -127,15 +144,52 @@ def create_issue(args: argparse.Namespace, *, dry_run: bool) -> None:
     run(["gh", "issue", "create", "--title", title, "--body", body], dry_run=dry_run)
 
 
+class ActivityLog:
+    """Append activity lines to an ``O_APPEND`` descriptor in a single write.
+
+    Bulk callers open it once and call ``log`` per entry instead of paying an
+    open/close per line::
+
+        with ActivityLog(target) as activity:
+            for timestamp in timestamps:
+                activity.log(timestamp)
+    """
+
+    def __init__(self, target: Path) -> None:
+        self.target = target
+        self._fd: int | None = None
+        self._pending = bytearray()
+
+    def __enter__(self) -> ActivityLog:
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.target, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._fd is None:
+            return
+        fd, pending = self._fd, self._pending
+        self._fd, self._pending = None, bytearray()
+        try:
+            view = memoryview(pending)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    def log(self, timestamp: dt.datetime) -> None:
+        if self._fd is None:
+            raise AutoActivityError("ActivityLog.log() called outside of a 'with' block.")
+        self._pending += f"{timestamp.date()} auto activity {timestamp.isoformat()}\n".encode()
+
+
 def append_activity_line(target: Path, timestamp: dt.datetime) -> None:
-    target.parent.mkdir(parents=True, exist_ok=True)
-    line = f"{timestamp.date()} auto activity {timestamp.isoformat()}\n"
-    with target.open("a", encoding="utf-8") as handle:
-        handle.write(line)
+    with ActivityLog(target) as activity:
+        activity.log(timestamp)
 
 
-def create_pr(args: argparse.Namespace, repo_root: Path, *, dry_run: bool) -> None:
-    ensure_clean_worktree(dry_run=dry_run)
+def create_pr(args: argparse.Namespace, state: RepoState, *, dry_run: bool) -> None:
+    ensure_clean_worktree(state, dry_run=dry_run)
     timestamp = dt.datetime.now()
     branch = args.branch or f"activity/{timestamp.strftime('%Y%m%d-%H%M%S')}"
     commit_message = args.commit_message or f"chore: auto activity {timestamp.date()}"
@@ -149,7 +203,7 @@ def create_pr(args: argparse.Namespace, repo_root: Path, *, dry_run: bool) -> No
     run(["git", "pull", "--ff-only", "origin", args.base], dry_run=dry_run)
     run(["git", "checkout", "-b", branch], dry_run=dry_run)
 
-    target = (repo_root / args.file).resolve()
+    target = (state.root / args.file).resolve()
     if dry_run:
         print(f"[dry-run] would append activity line to {target}")
     else:
@@ -190,14 +244,15 @@ def main() -> None:
     ensure_cli_available("git")
     ensure_cli_available("gh")
 
-    repo_root = Path.cwd()
-    ensure_repo(repo_root)
+    state = startup_probe(check_status=args.create_pr)
+    if state.root != Path.cwd().resolve():
+        raise AutoActivityError(f"Run auto_activity.py from the repository root ({state.root}).")
 
     if args.create_issue:
         create_issue(args, dry_run=args.dry_run)
 
     if args.create_pr:
-        create_pr(args, repo_root, dry_run=args.dry_run)
+        create_pr(args, state, dry_run=args.dry_run)
 
 
 if __name__ == "__main__":
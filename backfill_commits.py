@@ -12,12 +12,18 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import io
 import os
 import random
+import shlex
 import shutil
 import subprocess
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Callable
 
 try:
     from zoneinfo import ZoneInfo
@@ -41,6 +47,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--push", action="store_true", help="Push to origin after committing.")
     parser.add_argument("--dry-run", action="store_true", help="Preview commits without making changes.")
     parser.add_argument("--timezone", type=str, help="IANA timezone name (e.g. Asia/Tokyo).")
+    parser.add_argument("--verbose", action="store_true", help="Print a line for every commit, not just every day.")
+    parser.add_argument(
+        "--emit-stream", metavar="PATH", help="Write the fast-import stream to PATH, then exec git to import it."
+    )
+    parser.add_argument("--seed", type=int, help="Seed for commit counts and times (reproducible runs).")
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Worker processes for building the import stream (0 = one per CPU)."
+    )
     return parser.parse_args()
 
 
@@ -49,11 +63,6 @@ def ensure_git_available() -> None:
         raise BackfillError("git executable not found in PATH.")
 
 
-def ensure_git_repo(path: Path) -> None:
-    if not (path / ".git").exists():
-        raise BackfillError("Current directory is not a Git repository (missing .git).")
-
-
 def parse_date(value: str) -> dt.date:
     try:
         return dt.datetime.strptime(value, "%Y-%m-%d").date()
@@ -89,14 +98,14 @@ def resolve_timezone(name: str | None) -> dt.tzinfo:
     return auto
 
 
-def compute_date_range(args: argparse.Namespace, tz: dt.tzinfo) -> tuple[dt.date, dt.date]:
+def compute_date_range(start_value: str | None, end_value: str | None, tz: dt.tzinfo) -> tuple[dt.date, dt.date]:
     today = dt.datetime.now(tz=tz).date()
-    if args.start:
-        start = parse_date(args.start)
+    if start_value:
+        start = parse_date(start_value)
     else:
         start = today - dt.timedelta(days=730)
-    if args.end:
-        end = parse_date(args.end)
+    if end_value:
+        end = parse_date(end_value)
     else:
         end = today - dt.timedelta(days=1)
     if end >= today:
@@ -113,44 +122,49 @@ def date_iter(start: dt.date, end: dt.date):
         current += dt.timedelta(days=1)
 
 
+def _run_git(cmd: list[str], *, capture: bool = False, check: bool = True) -> subprocess.CompletedProcess[str]:
+    """Run a git command (or a shell chain of them) with no stdin and stderr kept for errors."""
+    return subprocess.run(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=check,
+        close_fds=False,  # keep.log handles and pipes are opened non-inheritable
+    )
+
+
 def git_check_output(cmd: list[str]) -> str:
-    return subprocess.check_output(cmd, text=True).strip()
+    return _run_git(cmd, capture=True).stdout.strip()
 
 
-def git_branch_exists(branch: str) -> bool:
-    result = subprocess.run(
-        ["git", "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        check=False,
-    )
-    return result.returncode == 0
+@dataclass(frozen=True)
+class RepoProbe:
+    current_branch: str | None
+    branches: frozenset[str]
+    has_commits: bool
 
 
-def git_has_commits() -> bool:
-    result = subprocess.run(
-        ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
+def probe_repo(repo_root: Path) -> RepoProbe:
+    """Check the repository and learn its branch state from one ``git rev-parse``."""
+    result = _run_git(
+        ["git", "rev-parse", "--show-toplevel", "--symbolic-full-name", "HEAD", "--symbolic", "--branches"],
+        capture=True,
         check=False,
     )
-    return result.returncode == 0
-
-
-def get_current_branch() -> str | None:
-    try:
-        branch = git_check_output(["git", "symbolic-ref", "--quiet", "--short", "HEAD"])
-        if branch:
-            return branch
-    except subprocess.CalledProcessError:
-        pass
-    try:
-        branch = git_check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"])
-        if branch and branch != "HEAD":
-            return branch
-    except subprocess.CalledProcessError:
-        pass
-    return None
+    lines = result.stdout.splitlines()
+    if not lines:
+        raise BackfillError(f"Not a usable Git repository: {result.stderr.strip()}")
+    if Path(lines[0]).resolve() != repo_root.resolve():
+        raise BackfillError(f"Run from the repository root ({lines[0]}).")
+    if result.returncode == 0:
+        head = lines[1]
+        current = head.removeprefix("refs/heads/") if head.startswith("refs/heads/") else None
+        return RepoProbe(current, frozenset(lines[2:]), True)
+    # Only an unborn HEAD fails to resolve once the top level has been printed.
+    branch = git_check_output(["git", "symbolic-ref", "--quiet", "--short", "HEAD"])
+    return RepoProbe(branch or None, frozenset(), False)
 
 
 def checkout_branch(branch: str, allow_create: bool, dry_run: bool) -> None:
@@ -158,22 +172,33 @@ def checkout_branch(branch: str, allow_create: bool, dry_run: bool) -> None:
         print(f"[dry-run] Would checkout branch '{branch}' (create={allow_create}).")
         return
     if allow_create:
-        subprocess.check_call(["git", "checkout", "-B", branch])
+        _run_git(["git", "checkout", "-B", branch])
     else:
-        subprocess.check_call(["git", "checkout", branch])
+        _run_git(["git", "checkout", branch])
+
+
+SEED_MESSAGE = "chore: seed backfill history"
 
 
 def ensure_seed_commit(file_path: Path, tz: dt.tzinfo) -> None:
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    """Create the root commit with plumbing only: no porcelain, hooks or signing."""
     with file_path.open("a", encoding="utf-8") as handle:
         handle.write("seed\n")
     now = dt.datetime.now(tz=tz).replace(microsecond=0)
     timestamp = now.strftime("%Y-%m-%dT%H:%M:%S%z")
-    env = os.environ.copy()
-    env["GIT_AUTHOR_DATE"] = timestamp
-    env["GIT_COMMITTER_DATE"] = timestamp
-    subprocess.check_call(["git", "add", str(file_path)])
-    subprocess.check_call(["git", "commit", "-m", "chore: seed backfill history"], env=env)
+    # The shell scopes the dates to commit-tree itself; no environment copy on our side.
+    dates = f"GIT_AUTHOR_DATE={shlex.quote(timestamp)} GIT_COMMITTER_DATE={shlex.quote(timestamp)}"
+    commit_tree = shlex.join(["git", "commit-tree", "--no-gpg-sign", "-m", SEED_MESSAGE])
+    update_ref = shlex.join(["git", "update-ref", "-m", f"commit (initial): {SEED_MESSAGE}", "HEAD"])
+    script = " && ".join(
+        [
+            shlex.join(["git", "update-index", "--add", "--", str(file_path)]),
+            "tree=$(git write-tree)",
+            f'commit=$({dates} {commit_tree} "$tree")',
+            f'{update_ref} "$commit"',
+        ]
+    )
+    _run_git(["/bin/sh", "-c", script])
 
 
 def ensure_origin_exists() -> None:
@@ -183,130 +208,358 @@ def ensure_origin_exists() -> None:
         raise BackfillError("Remote 'origin' not configured; cannot push.")
 
 
-def plan_commits_per_day(date_list: list[dt.date], min_commits: int, max_commits: int) -> dict[dt.date, int]:
-    rng = random.Random()
-    plan = {}
-    for day in date_list:
-        plan[day] = rng.randint(min_commits, max_commits)
-    return plan
+def plan_commits_per_day(
+    date_list: list[dt.date], min_commits: int, max_commits: int, rng: random.Random
+) -> list[tuple[dt.date, int]]:
+    if min_commits == max_commits:
+        return [(day, min_commits) for day in date_list]
+    return list(zip(date_list, rng.choices(range(min_commits, max_commits + 1), k=len(date_list))))
 
 
 def format_local_iso(local_dt: dt.datetime) -> str:
     return local_dt.strftime("%Y-%m-%dT%H:%M:%S%z")
 
 
-def append_line(file_path: Path, content: str) -> None:
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    with file_path.open("a", encoding="utf-8") as handle:
-        handle.write(content)
+def fixed_day_offset(day: dt.date, tz: dt.tzinfo) -> tuple[int, str] | None:
+    """Return (local midnight epoch, ``%z`` offset) if ``day`` keeps one UTC offset throughout."""
+    midnight = dt.datetime.combine(day, dt.time(0), tzinfo=tz)
+    if midnight.utcoffset() != dt.datetime.combine(day, dt.time(23, 59, 59), tzinfo=tz).utcoffset():
+        return None
+    return int(midnight.timestamp()), midnight.strftime("%z")
+
+
+def git_ident(kind: str) -> bytes:
+    """Return ``Name <email>`` for ``GIT_AUTHOR_IDENT``/``GIT_COMMITTER_IDENT``."""
+    ident = git_check_output(["git", "var", kind])
+    return ident.rsplit(" ", 2)[0].encode()
+
+
+FAST_IMPORT = ["git", "fast-import", "--date-format=raw", "--quiet"]
+
+# Minute and second values drawn for each commit.
+SIXTY = range(60)
+
+# Progress lines buffered before each write to stdout.
+PROGRESS_BATCH = 128
+
+# Commits per worker task with --jobs > 1. Small slices keep the rendered stream
+# in flight bounded (each record inlines the whole keep.log snapshot).
+IMPORT_SLICE = 16
+
+# (commit message, keep.log line, raw fast-import date) for one planned commit.
+ImportEntry = tuple[bytes, bytes, bytes]
+
+
+def write_import_records(
+    stream: BinaryIO,
+    ref: bytes,
+    rel_path: bytes,
+    author: bytes,
+    committer: bytes,
+    content: bytearray,
+    entries: list[ImportEntry],
+    first_mark: int,
+) -> None:
+    """Write a fast-import record per entry straight to ``stream``, growing ``content`` as it goes."""
+    for offset, (message, line, when) in enumerate(entries):
+        content += line
+        stream.write(
+            b"commit %s\nmark :%d\nauthor %s %s\ncommitter %s %s\ndata %d\n%s\n"
+            % (ref, first_mark + offset, author, when, committer, when, len(message), message)
+        )
+        if first_mark + offset == 1:
+            stream.write(b"from %s^0\n" % ref)
+        stream.write(b"M 100644 inline %s\ndata %d\n" % (rel_path, len(content)))
+        stream.write(content)
+        stream.write(b"\n")
+
+
+def format_import_slice(
+    ref: bytes,
+    rel_path: bytes,
+    author: bytes,
+    committer: bytes,
+    base: bytes,
+    entries: list[ImportEntry],
+    first_mark: int,
+) -> bytes:
+    """Worker side of --jobs: render one slice of records on top of ``base``."""
+    out = io.BytesIO()
+    write_import_records(out, ref, rel_path, author, committer, bytearray(base), entries, first_mark)
+    return out.getvalue()
+
+
+def write_import_stream(
+    stream: BinaryIO,
+    ref: bytes,
+    rel_path: bytes,
+    author: bytes,
+    committer: bytes,
+    base: bytes,
+    entries: list[ImportEntry],
+    jobs: int,
+) -> bytearray:
+    """Stream every record to ``stream``; returns the final keep.log contents."""
+    content = bytearray(base)
+    if jobs == 1 or len(entries) <= IMPORT_SLICE:
+        write_import_records(stream, ref, rel_path, author, committer, content, entries, 1)
+        return content
+    # Slices are written in order as they finish, with at most 2 * jobs in flight.
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for first in range(0, len(entries), IMPORT_SLICE):
+            chunk = entries[first : first + IMPORT_SLICE]
+            pending.append(
+                pool.submit(format_import_slice, ref, rel_path, author, committer, bytes(content), chunk, first + 1)
+            )
+            content += b"".join(line for _, line, _ in chunk)
+            if len(pending) >= 2 * jobs:
+                stream.write(pending.popleft().result())
+        while pending:
+            stream.write(pending.popleft().result())
+    return content
 
 
 def perform_commits(
-    plan: dict[dt.date, int],
+    plan: list[tuple[dt.date, int]],
+    branch: str,
+    repo_root: Path,
     file_path: Path,
     tz: dt.tzinfo,
-    work_hours: tuple[int, int],
+    hour_choices: range,
+    rng: random.Random,
     dry_run: bool,
+    jobs: int = 1,
+    emit_stream: str | None = None,
+    verbose: bool = False,
 ) -> int:
-    rng = random.Random()
+    """Stream every planned commit through a single ``git fast-import``.
+
+    Timestamps are drawn serially so the history does not depend on ``jobs``;
+    only rendering the import stream is spread over worker processes. With
+    ``emit_stream`` the stream is written to that file instead of imported.
+    """
     total_commits = 0
-    start_hour, end_hour = work_hours
-    for day in sorted(plan):
-        count = plan[day]
+    planned = sum(count for _, count in plan)
+    hours = rng.choices(hour_choices, k=planned)
+    minutes = rng.choices(SIXTY, k=planned)
+    seconds = rng.choices(SIXTY, k=planned)
+    entries: list[ImportEntry] = []
+    # Progress goes out in batches; a line-buffered terminal would otherwise flush every line.
+    out = sys.stdout
+    progress: list[str] = []
+    for day, count in plan:
         date_str = day.isoformat()
-        print(f"{date_str}: planned {count} commit(s).")
+        progress.append(f"{date_str}: planned {count} commit(s).\n")
+        # Only DST transition days need the tz database per commit.
+        fixed = fixed_day_offset(day, tz)
         for index in range(1, count + 1):
-            hour = rng.randint(start_hour, end_hour)
-            minute = rng.randint(0, 59)
-            second = rng.randint(0, 59)
-            local_time = dt.time(hour=hour, minute=minute, second=second)
-            local_dt = dt.datetime.combine(day, local_time, tzinfo=tz)
-            iso_timestamp = format_local_iso(local_dt)
-            message = f"backfill: {date_str} ({index}/{count})"
-            line = f"{date_str} {index}/{count} {iso_timestamp}\n"
+            drawn = total_commits + index - 1
+            hour, minute, second = hours[drawn], minutes[drawn], seconds[drawn]
+            if fixed is None:
+                local_time = dt.time(hour=hour, minute=minute, second=second)
+                local_dt = dt.datetime.combine(day, local_time, tzinfo=tz)
+                iso_timestamp = format_local_iso(local_dt)
+                epoch, offset = int(local_dt.timestamp()), local_dt.strftime("%z")
+            else:
+                midnight, offset = fixed
+                iso_timestamp = f"{date_str}T{hour:02d}:{minute:02d}:{second:02d}{offset}"
+                epoch = midnight + hour * 3600 + minute * 60 + second
             if dry_run:
-                print(f"  [dry-run] {message} at {iso_timestamp}")
+                if verbose:
+                    progress.append(f"  [dry-run] backfill: {date_str} ({index}/{count}) at {iso_timestamp}\n")
                 continue
-            append_line(file_path, line)
-            subprocess.check_call(["git", "add", str(file_path)])
-            env = os.environ.copy()
-            env["GIT_AUTHOR_DATE"] = iso_timestamp
-            env["GIT_COMMITTER_DATE"] = iso_timestamp
-            subprocess.check_call(["git", "commit", "-m", message], env=env)
-            print(f"  committed {index}/{count} at {iso_timestamp}")
-            total_commits += 1
-        if dry_run:
-            total_commits += count
+            message = f"backfill: {date_str} ({index}/{count})"
+            line = f"{date_str} {index}/{count} {iso_timestamp}\n"
+            when = f"{epoch} {offset}".encode()
+            entries.append((message.encode(), line.encode(), when))
+            if verbose:
+                progress.append(f"  queued {index}/{count} at {iso_timestamp}\n")
+        total_commits += count
+        if len(progress) >= PROGRESS_BATCH:
+            out.write("".join(progress))
+            out.flush()
+            progress.clear()
+    out.write("".join(progress))
+    out.flush()
+    if dry_run or not total_commits:
+        return total_commits
+
+    author = git_ident("GIT_AUTHOR_IDENT")
+    committer = git_ident("GIT_COMMITTER_IDENT")
+    ref = f"refs/heads/{branch}".encode()
+    rel_path = file_path.relative_to(repo_root.resolve()).as_posix().encode()
+    base = file_path.read_bytes() if file_path.exists() else b""
+
+    if emit_stream is not None:
+        with open(emit_stream, "wb") as stream:
+            write_import_stream(stream, ref, rel_path, author, committer, base, entries, jobs)
+        return total_commits
+
+    # stderr stays on the terminal: piping it while feeding stdin could deadlock.
+    importer = subprocess.Popen(FAST_IMPORT, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, close_fds=False)
+    with importer.stdin as stream:
+        content = write_import_stream(stream, ref, rel_path, author, committer, base, entries, jobs)
+    if importer.wait() != 0:
+        raise subprocess.CalledProcessError(importer.returncode, importer.args)
+
+    # fast-import only touched the ref; sync that one file in the worktree and index,
+    # leaving anything else the user staged alone.
+    with file_path.open("ab") as handle:
+        handle.write(memoryview(content)[len(base) :])
+    _run_git(["git", "reset", "--quiet", "--", rel_path.decode()])
     return total_commits
 
 
-def main() -> None:
-    args = parse_args()
+# Planners return (day, commit count) pairs in date order.
+Planner = Callable[[list[dt.date], int, int, random.Random], list[tuple[dt.date, int]]]
+
+
+def run_backfill(
+    branch: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    *,
+    per_day_min: int = 1,
+    per_day_max: int = 2,
+    work_hours: str = "10-19",
+    file: str = "keep.log",
+    push: bool = False,
+    dry_run: bool = False,
+    timezone: str | None = None,
+    planner: Planner = plan_commits_per_day,
+    jobs: int = 1,
+    seed: int | None = None,
+    emit_stream: str | None = None,
+    verbose: bool = False,
+    defer_push: bool = False,
+) -> int:
+    """Backfill commits between ``start`` and ``end``; returns the commit count.
+
+    ``planner`` decides how many commits land on each day, which lets callers
+    such as activity_automation.py sample days without patching this module.
+    With ``emit_stream`` nothing is imported or pushed; see ``replay_command``.
+    ``defer_push`` checks the remote but leaves the push itself to the caller.
+    """
     ensure_git_available()
     repo_root = Path.cwd()
-    ensure_git_repo(repo_root)
+    probe = probe_repo(repo_root)
 
-    if args.per_day_min <= 0 or args.per_day_max <= 0:
+    if per_day_min <= 0 or per_day_max <= 0:
         raise BackfillError("per-day values must be positive integers.")
-    if args.per_day_min > args.per_day_max:
+    if per_day_min > per_day_max:
         raise BackfillError("--per-day-min must not exceed --per-day-max.")
+    if jobs < 0:
+        raise BackfillError("--jobs must not be negative.")
+    jobs = jobs or os.cpu_count() or 1
 
-    tz = resolve_timezone(args.timezone)
-    start_date, end_date = compute_date_range(args, tz)
+    tz = resolve_timezone(timezone)
+    start_date, end_date = compute_date_range(start, end, tz)
     dates = list(date_iter(start_date, end_date))
     if not dates:
         print("No dates to process.")
-        return
+        return 0
 
-    work_hours = parse_work_hours(args.work_hours)
-    target_branch = args.branch
-    current_branch = get_current_branch()
+    start_hour, end_hour = parse_work_hours(work_hours)
+    hour_choices = range(start_hour, end_hour + 1)
+    target_branch = branch
+    current_branch = probe.current_branch
+    has_commits = probe.has_commits
 
-    if target_branch:
-        branch_exists = git_branch_exists(target_branch)
-    else:
+    if not target_branch:
         if current_branch:
             target_branch = current_branch
         else:
             target_branch = "main"
-        branch_exists = git_branch_exists(target_branch)
-
-    has_commits = git_has_commits()
+    branch_exists = target_branch in probe.branches
 
-    if args.dry_run:
+    if dry_run:
         if not has_commits:
             print(f"[dry-run] Repository has no commits; would create seed commit on branch '{target_branch}'.")
-        if args.branch and args.branch != current_branch:
+        if branch and branch != current_branch:
             action = "create and checkout" if not branch_exists else "checkout"
-            print(f"[dry-run] Would {action} branch '{args.branch}'.")
+            print(f"[dry-run] Would {action} branch '{branch}'.")
     else:
-        if args.branch:
+        if branch:
             checkout_branch(target_branch, allow_create=not branch_exists, dry_run=False)
         elif current_branch != target_branch:
             checkout_branch(target_branch, allow_create=not branch_exists, dry_run=False)
 
-    file_path = (repo_root / args.file).resolve()
+    file_path = (repo_root / file).resolve()
+    if not dry_run:
+        # Created once here; ensure_seed_commit and perform_commits rely on it.
+        file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if not has_commits and not args.dry_run:
+    if not has_commits and not dry_run:
         checkout_branch(target_branch, allow_create=True, dry_run=False)
         ensure_seed_commit(file_path, tz)
         print(f"Created seed commit on branch '{target_branch}'.")
 
-    plan = plan_commits_per_day(dates, args.per_day_min, args.per_day_max)
-    total = perform_commits(plan, file_path, tz, work_hours, args.dry_run)
+    rng = random.Random(seed)
+    plan = planner(dates, per_day_min, per_day_max, rng)
+    total = perform_commits(
+        plan, target_branch, repo_root, file_path, tz, hour_choices, rng, dry_run, jobs, emit_stream, verbose
+    )
 
-    if args.dry_run:
+    if dry_run:
         print(f"[dry-run] Planned total commits: {total}")
+    elif emit_stream is not None:
+        print(f"Wrote {total} commit(s) from {start_date} to {end_date} to {emit_stream}.")
     else:
         print(f"Completed {total} commit(s) from {start_date} to {end_date}.")
 
-    if args.push:
-        if args.dry_run:
+    if push:
+        if dry_run:
             print(f"[dry-run] Would push branch '{target_branch}' to origin.")
+        elif emit_stream is not None or defer_push:
+            ensure_origin_exists()
         else:
             ensure_origin_exists()
-            subprocess.check_call(["git", "push", "-u", "origin", target_branch])
+            _run_git(["git", "push", "-u", "origin", target_branch])
             print(f"Pushed branch '{target_branch}' to origin.")
+    return total
+
+
+def replay_command(stream_path: str, file: str, push: bool) -> str:
+    """Shell command that imports an emitted stream and syncs the checkout, like a live run."""
+    steps = [
+        f"{shlex.join(FAST_IMPORT)} < {shlex.quote(stream_path)}",
+        shlex.join(["git", "checkout", "HEAD", "--", file]),
+    ]
+    if push:
+        steps.append(shlex.join(["git", "push", "-u", "origin", "HEAD"]))
+    return " && ".join(steps)
+
+
+def main() -> None:
+    args = parse_args()
+    total = run_backfill(
+        args.branch,
+        args.start,
+        args.end,
+        per_day_min=args.per_day_min,
+        per_day_max=args.per_day_max,
+        work_hours=args.work_hours,
+        file=args.file,
+        push=args.push,
+        dry_run=args.dry_run,
+        timezone=args.timezone,
+        jobs=args.jobs,
+        seed=args.seed,
+        emit_stream=args.emit_stream,
+        verbose=args.verbose,
+        defer_push=True,
+    )
+    if args.dry_run:
+        return
+    # Hand the rest of the run to git so Python is gone before the network round trip.
+    if args.emit_stream and total:
+        sys.stdout.flush()
+        os.execvp("sh", ["sh", "-c", replay_command(args.emit_stream, args.file, args.push)])
+    if args.push:
+        print("Pushing the current branch to origin.")
+        sys.stdout.flush()
+        os.execvp("git", ["git", "push", "-u", "origin", "HEAD"])
 
 
 if __name__ == "__main__":
@@ -317,4 +570,6 @@ if __name__ == "__main__":
         sys.exit(1)
     except subprocess.CalledProcessError as error:
         print(f"Git command failed: {error}", file=sys.stderr)
+        if error.stderr:
+            print(error.stderr.rstrip(), file=sys.stderr)
         sys.exit(error.returncode)
@@ -7,8 +7,9 @@ import hashlib
 
 def fingerprint(text: str, length: int = 8) -> str:
     """Return a short hexadecimal fingerprint for the given text."""
-    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
-    return digest[:length]
+    # blake2b sized to the requested length; its digest_size is capped at 64 bytes.
+    size = min(max((length + 1) // 2, 1), 64)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=size).hexdigest()[:length]
 
 
 if __name__ == "__main__":